@@ -0,0 +1,78 @@
+"""
+Startup benchmark for generate_crud with many models.
+
+    python benchmarks/startup.py [model_count]
+
+Registers ``model_count`` generated models (400 by default) on a fresh Flask app with the
+default registration path and with ``FAST_REGISTRATION`` enabled, and prints the best time of
+several runs for each.
+"""
+import os
+import sys
+import time
+
+from flask import Flask
+from peewee import CharField, DateTimeField, ForeignKeyField, IntegerField, Model, SqliteDatabase
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_peewee_crud import CrudConfig, generate_crud  # noqa: E402
+
+db = SqliteDatabase(':memory:')
+RUNS = 5
+
+
+class BaseModel(Model):
+    class Meta:
+        database = db
+
+
+def make_models(count):
+    models = []
+    for i in range(count):
+        attrs = {
+            '__module__': __name__,
+            'name': CharField(max_length=64),
+            'email': CharField(null=True),
+            'score': IntegerField(default=0),
+            'created': DateTimeField(null=True),
+        }
+        if models:
+            attrs['parent'] = ForeignKeyField(models[-1], null=True, related_name='children_{}'.format(i))
+        models.append(type('Table{}'.format(i), (BaseModel,), attrs))
+
+    return models
+
+
+def run(models, fast_registration):
+    config = CrudConfig()
+    config.FAST_REGISTRATION = fast_registration
+
+    best = None
+    for _ in range(RUNS):
+        app = Flask(__name__)
+        app.config.crud_config = config
+        start = time.time()
+        generate_crud(app, models)
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+
+    start = time.time()
+    import inflect  # noqa: F401
+    print('import inflect: {:.1f} ms'.format((time.time() - start) * 1000))
+
+    models = make_models(count)
+    for fast_registration in (False, True):
+        elapsed = run(models, fast_registration)
+        print('generate_crud with {} models, FAST_REGISTRATION={}: {:.1f} ms'.format(
+            count, fast_registration, elapsed * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+import threading
+
+from flask import request
+
+
+class _Call(object):
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(object):
+    """
+    Coalesces concurrent calls with the same key within one process: the first caller
+    runs the computation and every caller arriving while it is in flight waits for and
+    shares its result. Callers waiting longer than ``timeout`` seconds give up and run
+    the computation themselves.
+    """
+
+    def __init__(self, timeout=10):
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.executed = 0
+        self.shared = 0
+        self.timeouts = 0
+
+    def do(self, key, func):
+        """Returns ``(result, shared)`` where ``shared`` is True if another caller computed the result."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                self.shared += 1
+
+        if leader:
+            try:
+                call.result = func()
+            except Exception as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.event.set()
+        elif not call.event.wait(self.timeout):
+            with self._lock:
+                self.shared -= 1
+                self.timeouts += 1
+                self.executed += 1
+            return func(), False
+
+        if call.error is not None:
+            raise call.error
+
+        return call.result, not leader
+
+    def stats(self):
+        with self._lock:
+            total = self.executed + self.shared
+            return {
+                'executed': self.executed,
+                'shared': self.shared,
+                'timeouts': self.timeouts,
+                'in_flight': len(self._calls),
+                'dedup_ratio': float(self.shared) / total if total else 0.0
+            }
+
+
+def request_key(model):
+    """
+    Normalized key of the current GET request, the endpoint tells apart the resources
+    serving one model, e.g. ``/person`` and ``/person/_batch``.
+    """
+    return (
+        model._meta.db_table,
+        request.endpoint,
+        tuple(sorted((request.view_args or {}).items())),
+        tuple(sorted(request.args.items(multi=True)))
+    )
+
+
+def coalesced(func):
+    """
+    Runs a GET handler through ``config.REQUEST_COALESCER`` when one is configured, identical
+    concurrent requests then share the serialized response of a single computation.
+    """
+
+    def wrapped(self, *args, **kwargs):
+        single_flight = self.config.REQUEST_COALESCER
+        if single_flight is None:
+            return func(self, *args, **kwargs)
+
+        key = request_key(self.model)
+
+        def compute():
+            response = func(self, *args, **kwargs)
+            return response.get_data(), response.status_code, list(response.headers.items())
+
+        (body, status_code, headers), shared = single_flight.do(key, compute)
+        if shared:
+            self.log.debug('Shared in-flight response for %s', request.path)
+
+        return self.app.response_class(body, status=status_code, headers=headers)
+
+    return wrapped
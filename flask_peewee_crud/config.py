@@ -15,6 +15,11 @@ class ResponseMessages:
     ErrorInvalidJSON = 'Invalid JSON input'
     ErrorInvalidFilterOption = 'Invalid Filter Option: {0}, valid options are {1}'
     ErrorFieldOutOfRange = 'Invalid range for field \'{0}\', must be between {1} and {2}'
+    ErrorRateLimited = 'Rate limit exceeded, retry in {0} seconds'
+    ErrorQueryCostExceeded = 'Query cost {0} exceeds the maximum of {1}'
+    ErrorQueryBudgetExceeded = 'Request ran {0} SQL queries, the budget is {1}'
+    ErrorBatchTooLarge = 'Too many ids: {0}, the maximum is {1}'
+    ErrorSearchNotEnabled = 'Full-text search is not enabled for \'{0}\', searchable fields are {1}'
 
     # Success
     SuccessOk = 'OK'
@@ -26,6 +31,29 @@ class ResponseMessages:
 class CrudConfig(object):
     COLLECTION_MAX_RESULTS_PER_PAGE = 100
 
+    # Batch resource limits, ids are fetched with one WHERE pk IN (...) query per chunk
+    BATCH_MAX_IDS = 1000
+    BATCH_CHUNK_SIZE = 500
+
+    # Include nullable, max_length, foreign key targets and filter options in the '/' route
+    BASE_ROUTE_EXTENDED_SCHEMA = False
+
+    # Register one dispatching view per resource kind instead of two view classes per model and
+    # name collection endpoints with a cheap pluralizer instead of inflect, for apps with many models
+    FAST_REGISTRATION = False
+
+    # flask_peewee_crud.rate_limit.RateLimiter instance applied to collection GET requests, None to disable
+    RATE_LIMITER = None
+
+    # flask_peewee_crud.coalescing.SingleFlight instance shared by GET requests, None to disable
+    REQUEST_COALESCER = None
+
+    # flask_peewee_crud.inspection.QueryInspector instance for debugging and tests, None to disable
+    QUERY_INSPECTOR = None
+
+    # flask_peewee_crud.invalidation.InvalidationBus instance shared by the workers, None to disable
+    INVALIDATION_BUS = None
+
     # {'filter_key': 'human readable description'}
     FILTER_OPTIONS = {
         'startswith': 'field starts with value',
@@ -37,66 +65,51 @@ class CrudConfig(object):
         'null': 'field is null',
         '=': 'field is equal to value',
         'in': 'field is in list',
-        'notin': 'field is not in list'
+        'notin': 'field is not in list',
+        'search': 'field matches full-text search query'
     }
 
+    # Text search configuration used for Postgres full-text indexes
+    SEARCH_LANGUAGE = 'english'
+
     response_messages = ResponseMessages()
 
 
+# Flask url converters for primary key db fields, anything else is matched as a string
+PRIMARY_KEY_CONVERTERS = {
+    'primary_key': 'int',
+    'int': 'int',
+    'bigint': 'int',
+    'smallint': 'int'
+}
+
+
 # Internal class only used to shortcut a variety of things
 class CrudShortcuts(object):
     def __init__(self, model):
         self.table_name = model._meta.db_table
         self.model = model
 
-    @property
-    def primary_key(self):
-        for key, value in self.fields.items():
+        # Everything below is derived from the model fields in a single pass, the fields of a
+        # model do not change once it has been registered
+        self.fields = {}
+        self.editable_fields = {}
+        self.required_fields = []
+        self.primary_key = None
+        self.primary_key_type = None
+        self.search_index = None
+
+        for key, value in model._meta.fields.items():
+            self.fields[key] = value
             if value.primary_key:
-                return key
-
-    @property
-    def primary_key_type(self):
-        pk_field = self.fields.get(self.primary_key).get_column_type()
-
-        column_type = pk_field.replace(' ', '')
-        column_type = column_type.replace('AUTO_INCREMENT', '')
-
-        types = {
-            'INTEGER': 'int',
-            'SERIAL': 'int',
-            'VARCHAR': 'str'
-        }
+                self.primary_key = key
+                self.primary_key_type = PRIMARY_KEY_CONVERTERS.get(value.get_db_field(), 'string')
+                continue
 
-        return types.get(column_type, None)
+            self.editable_fields[key] = value
+            if not value.null:
+                self.required_fields.append(key)
 
     @property
     def base_uri(self):
         return '/{}'.format(self.table_name)
-
-    @property
-    def required_fields(self):
-        required_fields = []
-        for field, field_object in self.editable_fields.items():
-            if not field_object.null:
-                required_fields.append(field)
-
-        return required_fields
-
-    @property
-    def editable_fields(self):
-        fields = {}
-        for key, value in self.model._meta.fields.items():
-            if self.primary_key == key:
-                continue
-
-            fields[key] = value
-        return fields
-
-    @property
-    def fields(self):
-        fields = {}
-        for key, value in self.model._meta.fields.items():
-            fields[key] = value
-
-        return fields
@@ -1,12 +1,35 @@
-import inflect
-from flask import jsonify
+import hashlib
+import threading
+
+from flask import current_app, json, jsonify, request
 from werkzeug.exceptions import HTTPException, default_exceptions
 
 from .config import CrudConfig, CrudShortcuts
+from .resources import BaseBatchResource
 from .resources import BaseCollectionResource
 from .resources import BaseSingleResource
+from .resources.base_resource import DispatchingResourceMixin
+from .search import create_search_index
+
+_inflect_engine = None
+
+
+def _plural(word):
+    # inflect is slow to import, only pay for it when an endpoint name is needed
+    global _inflect_engine
+    if _inflect_engine is None:
+        import inflect
+        _inflect_engine = inflect.engine()
+
+    return _inflect_engine.plural(word)
 
-p = inflect.engine()
+
+def _fast_plural(word):
+    if word.endswith(('s', 'x', 'z', 'ch', 'sh')):
+        return word + 'es'
+    if word.endswith('y') and word[-2:-1] not in 'aeiou':
+        return word[:-1] + 'ies'
+    return word + 's'
 
 
 def make_json_app(app):
@@ -37,65 +60,173 @@ def generate_crud(app, model_array):
     app = make_json_app(app)
     # Setup Configuration
     base_config = app.config.crud_config if hasattr(app.config, 'crud_config') else CrudConfig
+    fast_registration = base_config.FAST_REGISTRATION
+    plural = _fast_plural if fast_registration else _plural
+
+    if fast_registration:
+        # One view per resource kind, the model is resolved from the endpoint on each request
+        attrs = {'app': app, 'config': base_config, 'resources': {}}
+        SingleResource = type('SingleResource', (DispatchingResourceMixin, BaseSingleResource), attrs)
+        CollectionResource = type('CollectionResource', (DispatchingResourceMixin, BaseCollectionResource), attrs)
+        BatchResource = type('BatchResource', (DispatchingResourceMixin, BaseBatchResource), attrs)
+        single_view = SingleResource.as_view('single_resource')
+        collection_view = CollectionResource.as_view('collection_resource')
+        batch_view = BatchResource.as_view('batch_resource')
+
     for model in model_array:
         if not hasattr(model, 'crud_config'):
             config = base_config
         else:
             config = model.crud_config
 
+        if config.QUERY_INSPECTOR is not None:
+            config.QUERY_INSPECTOR.install(model._meta.database)
+            if config.INVALIDATION_BUS is not None:
+                config.INVALIDATION_BUS.subscribe(config.QUERY_INSPECTOR.evict)
+
         # Some handy shortcuts
         shortcuts = CrudShortcuts(model)
         model.shortcuts = shortcuts
+        if hasattr(model, 'search_fields'):
+            shortcuts.search_index = create_search_index(model, model.search_fields, config.SEARCH_LANGUAGE)
 
         # Generate Resources and Routes
         base_uri = model.route_url if hasattr(model, 'route_url') else shortcuts.base_uri
+        single_uri = base_uri + '/<{}:{}>'.format(shortcuts.primary_key_type, shortcuts.primary_key)
+        single_endpoint = shortcuts.table_name
+        collection_endpoint = plural(shortcuts.table_name)
+        batch_uri = base_uri + '/_batch'
+        batch_endpoint = shortcuts.table_name + '_batch'
+
+        if fast_registration:
+            attrs['resources'][single_endpoint] = (model, config)
+            attrs['resources'][collection_endpoint] = (model, config)
+            attrs['resources'][batch_endpoint] = (model, config)
+            app.add_url_rule(single_uri, endpoint=single_endpoint, view_func=single_view)
+            app.add_url_rule(base_uri, endpoint=collection_endpoint, view_func=collection_view)
+            app.add_url_rule(batch_uri, endpoint=batch_endpoint, view_func=batch_view)
+            continue
+
         attrs = {'model': model, 'config': config, 'app': app}
         SingleResource = type('SingleResource', (BaseSingleResource,), attrs)
         CollectionResource = type('CollectionResource', (BaseCollectionResource,), attrs)
+        BatchResource = type('BatchResource', (BaseBatchResource,), attrs)
         app.add_url_rule(
-            base_uri + '/<{}:{}>'.format(shortcuts.primary_key_type, shortcuts.primary_key),
-            view_func=SingleResource.as_view(shortcuts.table_name),
+            single_uri,
+            view_func=SingleResource.as_view(single_endpoint),
 
         )
         app.add_url_rule(
             base_uri,
-            view_func=CollectionResource.as_view(p.plural(shortcuts.table_name))
+            view_func=CollectionResource.as_view(collection_endpoint)
+        )
+        app.add_url_rule(
+            batch_uri,
+            view_func=BatchResource.as_view(batch_endpoint)
         )
 
-    # Add base route
-    app.add_url_rule('/', view_func=_generate_base_route(model_array), methods=['GET'])
-
+    # Opt-in local introspection route listing requests recorded by the query inspector
+    # and the request coalescing stats
+    inspector = base_config.QUERY_INSPECTOR
+    if inspector is not None:
+        for model in model_array:
+            config = getattr(model, 'crud_config', base_config)
+            if config.REQUEST_COALESCER is not None:
+                inspector.add_single_flight(config.REQUEST_COALESCER)
+    if inspector is not None and inspector.route and 'crud_query_inspector' not in app.view_functions:
+        app.add_url_rule(inspector.route, endpoint='crud_query_inspector', view_func=inspector.view, methods=['GET'])
+
+    # Add base route, or extend the existing one when models are registered again
+    base_route = app.extensions.get('flask_peewee_crud_base_route')
+    if base_route is None:
+        base_route = BaseRoute(base_config)
+        app.extensions['flask_peewee_crud_base_route'] = base_route
+        app.add_url_rule('/', endpoint='base_route', view_func=base_route, methods=['GET'])
+    base_route.register(model_array)
+
+
+class BaseRoute(object):
+    """
+    View for the '/' discovery route.
 
-def _generate_base_route(model_array):
-    tables = {}
+    The routes document is built lazily on the first request, serialized once to bytes
+    and served from that cache with a strong ETag until more models are registered.
+    """
 
-    for model in model_array:
-        fields = []
-        table_name = model.shortcuts.table_name
-        required_fields = model.shortcuts.required_fields
-        for field, field_object in model.shortcuts.fields.items():
-            field_name = field_object.name
-            field_type = field_object.get_db_field()
-            is_required = field_name in required_fields or field_type == 'primary_key'
-
-            fields.append({
-                'field_name': field_name,
-                'field_type': field_type,
-                'is_required': is_required
-            })
-
-        tables[table_name] = {
-            'route_url': model.route_url if hasattr(model, 'route_url') else '/{}'.format(table_name),
-            'fields': fields
-        }
+    def __init__(self, config):
+        self.config = config
+        self.models = []
+        self._cache = None
+        self._lock = threading.Lock()
+
+    def register(self, model_array):
+        with self._lock:
+            for model in model_array:
+                if model not in self.models:
+                    self.models.append(model)
+            self._cache = None
+
+    def __call__(self):
+        cache = self._cache
+        if cache is None:
+            with self._lock:
+                if self._cache is None:
+                    self._cache = self._build()
+                cache = self._cache
+
+        body, etag = cache
+        response = current_app.response_class(body, mimetype='application/json')
+        response.set_etag(etag)
+        return response.make_conditional(request)
+
+    def _build(self):
+        tables = {}
+        extended = getattr(self.config, 'BASE_ROUTE_EXTENDED_SCHEMA', False)
+
+        for model in self.models:
+            config = getattr(model, 'crud_config', self.config)
+            table_name = model.shortcuts.table_name
+            required_fields = model.shortcuts.required_fields
+
+            fields = []
+            for field, field_object in model.shortcuts.fields.items():
+                field_name = field_object.name
+                field_type = field_object.get_db_field()
+                is_required = field_name in required_fields or field_type == 'primary_key'
+
+                field_data = {
+                    'field_name': field_name,
+                    'field_type': field_type,
+                    'is_required': is_required
+                }
+
+                if extended:
+                    rel_model = getattr(field_object, 'rel_model', None)
+                    field_data.update({
+                        'nullable': field_object.null,
+                        'max_length': getattr(field_object, 'max_length', None),
+                        'foreign_key': rel_model._meta.db_table if rel_model is not None else None
+                    })
+
+                fields.append(field_data)
+
+            tables[table_name] = {
+                'route_url': model.route_url if hasattr(model, 'route_url') else '/{}'.format(table_name),
+                'fields': fields
+            }
+
+            if extended:
+                # search only works on models with search_fields
+                tables[table_name]['filter_options'] = sorted(
+                    option for option in config.FILTER_OPTIONS
+                    if option != 'search' or model.shortcuts.search_index is not None
+                )
 
-    def base_route():
         response_data = {
             'data': {'routes': tables},
             'status_code': 200,
             'message': 'OK'
         }
 
-        return jsonify(response_data)
-
-    return base_route
+        body = json.dumps(response_data, sort_keys=True).encode('utf-8')
+        return body, hashlib.sha1(body).hexdigest()
@@ -0,0 +1,169 @@
+import collections
+import threading
+import time
+
+from flask import abort, request
+from peewee import SqliteDatabase
+
+from .resources.base_resource import BaseResource
+
+LOCAL_ADDRESSES = ('127.0.0.1', '::1')
+
+
+def _is_full_scan(detail):
+    # SQLite: 'SCAN TABLE person' / 'SCAN person', Postgres: 'Seq Scan on person'
+    detail = detail.strip()
+    if detail.startswith('SCAN '):
+        return 'INDEX' not in detail
+    return 'Seq Scan on' in detail
+
+
+class QueryInspector(object):
+    """
+    Debug and test helper counting the SQL statements run by each request to the generated
+    resources. Requests exceeding ``budget`` are logged and recorded, and fail with a 500 when
+    ``raise_on_exceed`` is set. With ``explain`` enabled the query built for collection GETs is
+    run through EXPLAIN and full scans of tables with at least ``large_table_rows`` rows are
+    recorded too. When ``route`` is given, recorded requests are served from it to local
+    clients, along with the stats of the request coalescers added with ``add_single_flight``.
+    """
+
+    def __init__(self, budget=None, raise_on_exceed=False, explain=False, large_table_rows=10000,
+                 max_reports=100, route=None):
+        self.budget = budget
+        self.raise_on_exceed = raise_on_exceed
+        self.explain_queries = explain
+        self.large_table_rows = large_table_rows
+        self.route = route
+        self.reports = collections.deque(maxlen=max_reports)
+        self._local = threading.local()
+        self.single_flights = []
+        self._row_counts = {}
+        self._lock = threading.Lock()
+
+    def add_single_flight(self, single_flight):
+        if single_flight not in self.single_flights:
+            self.single_flights.append(single_flight)
+
+    def install(self, database):
+        """Wraps ``database.execute_sql`` so statements run during a request are counted."""
+        installed = getattr(database, '_crud_query_inspectors', None)
+        if installed is None:
+            installed = database._crud_query_inspectors = []
+        if self in installed:
+            return
+        installed.append(self)
+
+        execute_sql = database.execute_sql
+        inspector = self
+
+        def counted_execute_sql(sql, *args, **kwargs):
+            inspector._record(sql)
+            return execute_sql(sql, *args, **kwargs)
+
+        database.execute_sql = counted_execute_sql
+
+    def _record(self, sql):
+        queries = getattr(self._local, 'queries', None)
+        if queries is not None and not getattr(self._local, 'paused', False):
+            queries.append(sql)
+
+    def begin(self):
+        self._local.queries = []
+        self._local.warnings = []
+
+    def end(self, resource, response):
+        """
+        Records the request if needed and returns the response to send. ``response`` is None
+        when the handler raised, the request is then always recorded.
+        """
+        queries = getattr(self._local, 'queries', None) or []
+        warnings = getattr(self._local, 'warnings', None) or []
+        self._local.queries = None
+        self._local.warnings = None
+        self._local.paused = False
+
+        failed = response is None
+        over_budget = self.budget is not None and len(queries) > self.budget
+        if not over_budget and not warnings and not failed:
+            return response
+
+        self.reports.append({
+            'time': time.time(),
+            'method': request.method,
+            'path': request.full_path,
+            'query_count': len(queries),
+            'budget': self.budget,
+            'failed': failed,
+            'queries': queries,
+            'warnings': warnings
+        })
+
+        if over_budget:
+            message = resource.config.response_messages.ErrorQueryBudgetExceeded.format(len(queries), self.budget)
+            resource.log.warning('%s %s: %s', request.method, request.full_path, message)
+            if self.raise_on_exceed and not failed:
+                return resource.response_json(status_code=500, message=message)
+
+        for warning in warnings:
+            resource.log.warning('%s %s: full scan of %s (%s rows): %s', request.method, request.full_path,
+                                 warning['table'], warning['rows'], warning['sql'])
+
+        return response
+
+    def explain(self, model, query):
+        """Records a warning for the current request if ``query`` fully scans a large table."""
+        if not self.explain_queries or getattr(self._local, 'queries', None) is None:
+            return
+
+        database = model._meta.database
+        sql, params = query.sql()
+
+        self._local.paused = True
+        try:
+            if isinstance(database, SqliteDatabase):
+                plan = [row[-1] for row in database.execute_sql('EXPLAIN QUERY PLAN ' + sql, params).fetchall()]
+            else:
+                plan = [row[0] for row in database.execute_sql('EXPLAIN ' + sql, params).fetchall()]
+
+            if not any(_is_full_scan(detail) for detail in plan):
+                return
+
+            rows = self.row_count(model)
+        finally:
+            self._local.paused = False
+
+        if rows >= self.large_table_rows:
+            self._local.warnings.append({
+                'table': model._meta.db_table,
+                'rows': rows,
+                'sql': sql,
+                'plan': plan
+            })
+
+    def row_count(self, model):
+        table = model._meta.db_table
+        rows = self._row_counts.get(table)
+        if rows is None:
+            rows = model.select().count()
+            with self._lock:
+                self._row_counts[table] = rows
+
+        return rows
+
+    def evict(self, table=None):
+        """Drops the cached row count of ``table``, or of every table."""
+        with self._lock:
+            if table is None:
+                self._row_counts.clear()
+            else:
+                self._row_counts.pop(table, None)
+
+    def view(self):
+        if request.remote_addr not in LOCAL_ADDRESSES:
+            abort(403)
+        data = {
+            'requests': list(self.reports),
+            'coalescing': [single_flight.stats() for single_flight in self.single_flights]
+        }
+        return BaseResource.response_json(data=data, status_code=200, message='OK')
@@ -0,0 +1,147 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+# time.monotonic is not available on python 2
+_now = getattr(time, 'monotonic', time.time)
+
+log = logging.getLogger(__name__)
+
+
+class InvalidationBus(object):
+    """
+    Carries model-level change events between workers so each one can evict its local caches.
+
+    Write handlers ``publish`` the table they changed. Local subscribers are notified at once,
+    and other workers pick the event up the next time they ``poll``, which the resources do
+    at most every ``poll_interval`` seconds. Subclass and implement ``send`` and ``receive``
+    to use a message broker.
+    """
+
+    def __init__(self, poll_interval=1.0):
+        self.poll_interval = poll_interval
+        self._token = uuid.uuid4().hex
+        self._subscribers = []
+        self._last_poll = None
+        self._lock = threading.Lock()
+
+    @property
+    def origin(self):
+        # Includes the pid so workers forked after the bus was created stay distinct
+        return '{}-{}'.format(self._token, os.getpid())
+
+    def subscribe(self, callback):
+        """Registers ``callback(table)`` to be called for every change, from any worker."""
+        if callback not in self._subscribers:
+            self._subscribers.append(callback)
+
+    def publish(self, table):
+        self._notify(table)
+        try:
+            self.send(table)
+        except Exception:
+            log.exception('Could not publish invalidation of %s', table)
+
+    def poll(self):
+        now = _now()
+        if self._last_poll is not None and now - self._last_poll < self.poll_interval:
+            return
+
+        # Only one thread per worker polls, the others carry on with their request
+        if not self._lock.acquire(False):
+            return
+        try:
+            self._last_poll = now
+            origin = self.origin
+            for event_origin, table in self.receive():
+                if event_origin != origin:
+                    self._notify(table)
+        except Exception:
+            log.exception('Could not receive invalidations')
+        finally:
+            self._lock.release()
+
+    def _notify(self, table):
+        for callback in self._subscribers:
+            callback(table)
+
+    def send(self, table):
+        """Delivers a change of ``table`` to the other workers."""
+        raise NotImplementedError
+
+    def receive(self):
+        """Returns the ``(origin, table)`` events published since the last call."""
+        raise NotImplementedError
+
+
+class LocalInvalidationBus(InvalidationBus):
+    """Notifies subscribers in this process only, for single worker deployments and tests."""
+
+    def send(self, table):
+        pass
+
+    def receive(self):
+        return []
+
+
+class SqliteInvalidationBus(InvalidationBus):
+    """
+    Shares events through a table in a SQLite file, for workers on the same host. Each
+    process keeps its own connection and reads the rows added since its last poll. Rows
+    older than ``retention`` seconds are deleted every ``prune_every`` sends.
+    """
+
+    def __init__(self, path, poll_interval=1.0, retention=3600, prune_every=100):
+        super(SqliteInvalidationBus, self).__init__(poll_interval)
+        self.path = path
+        self.retention = retention
+        self.prune_every = prune_every
+        self._sends = 0
+        self._connection = None
+        self._connection_pid = None
+        self._connection_lock = threading.Lock()
+        self._last_id = 0
+
+    def _get_connection(self):
+        if self._connection_pid != os.getpid():
+            self._connection = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            self._connection_pid = os.getpid()
+            with self._connection:
+                self._connection.execute(
+                    'CREATE TABLE IF NOT EXISTS crud_invalidations ('
+                    'id INTEGER PRIMARY KEY AUTOINCREMENT, origin TEXT NOT NULL, '
+                    'model TEXT NOT NULL, created REAL NOT NULL)'
+                )
+                self._connection.execute(
+                    'CREATE INDEX IF NOT EXISTS crud_invalidations_created ON crud_invalidations (created)')
+                # Events from before this process connected do not concern its caches
+                self._last_id = self._connection.execute(
+                    'SELECT coalesce(max(id), 0) FROM crud_invalidations').fetchone()[0]
+
+        return self._connection
+
+    def send(self, table):
+        now = time.time()
+        with self._connection_lock:
+            connection = self._get_connection()
+            with connection:
+                connection.execute('INSERT INTO crud_invalidations (origin, model, created) VALUES (?, ?, ?)',
+                                   (self.origin, table, now))
+                self._sends += 1
+                if self._sends % self.prune_every == 0:
+                    connection.execute('DELETE FROM crud_invalidations WHERE created < ?', (now - self.retention,))
+
+    def receive(self):
+        with self._connection_lock:
+            connection = self._get_connection()
+            with connection:
+                rows = connection.execute(
+                    'SELECT id, origin, model FROM crud_invalidations WHERE id > ? ORDER BY id',
+                    (self._last_id,)).fetchall()
+            if rows:
+                self._last_id = rows[-1][0]
+
+        return [(origin, table) for _, origin, table in rows]
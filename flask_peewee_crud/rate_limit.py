@@ -0,0 +1,143 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from flask import request
+
+from .resources.base_resource import include_flags
+
+# time.monotonic is not available on python 2
+_now = getattr(time, 'monotonic', time.time)
+
+
+class RateLimitBackend(object):
+    """
+    Storage for token buckets. Subclass and implement ``consume`` to share the buckets
+    between processes, e.g. with an atomic script on a shared key-value store.
+    """
+
+    def consume(self, key, tokens, rate, capacity):
+        """
+        Take ``tokens`` from the bucket ``key``, refilled at ``rate`` tokens per second up to
+        ``capacity``. Returns 0 when the tokens were taken, otherwise the number of seconds
+        until enough tokens will be available.
+        """
+        raise NotImplementedError
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """Per-process token buckets, the least recently used is dropped once ``max_keys`` is exceeded."""
+
+    def __init__(self, max_keys=10000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key, tokens, rate, capacity):
+        now = _now()
+        with self._lock:
+            available, updated = self._buckets.pop(key, (capacity, now))
+            available = min(capacity, available + (now - updated) * rate)
+
+            if available >= tokens:
+                self._buckets[key] = (available - tokens, now)
+                wait = 0
+            else:
+                self._buckets[key] = (available, now)
+                wait = (tokens - available) / float(rate)
+
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+
+        return wait
+
+
+class RateLimiter(object):
+    """
+    Token bucket limiter for collection GET requests, keyed per client and per route.
+
+    Every request is charged its estimated query cost instead of a single token, and
+    requests costing more than ``max_query_cost`` (or the bucket capacity when unset)
+    are rejected before any SQL is run.
+    """
+
+    # Cost added on top of 1 for each expensive part of a collection query
+    COST_WEIGHTS = {
+        'foreign_keys': 2,      # recursing into foreign keys
+        'backrefs': 5,          # recursing into foreign keys and backrefs
+        'contains': 3,          # LIKE '%value%' cannot use an index
+        'startswith': 1,
+        'in_item': 0.1,         # per item of an in / notin list
+        'page': 0.1             # per page skipped by the offset
+    }
+
+    def __init__(self, backend=None, rate=10, capacity=100, max_query_cost=None, key_func=None):
+        if max_query_cost is not None and max_query_cost > capacity:
+            raise ValueError('max_query_cost ({}) cannot exceed the bucket capacity ({})'.format(
+                max_query_cost, capacity))
+
+        self.backend = backend if backend is not None else MemoryRateLimitBackend()
+        self.rate = rate
+        self.capacity = capacity
+        self.max_query_cost = max_query_cost if max_query_cost is not None else capacity
+        self.key_func = key_func
+
+    def client_key(self):
+        if self.key_func is not None:
+            return self.key_func()
+        return request.remote_addr
+
+    def estimate_cost(self, args):
+        weights = self.COST_WEIGHTS
+        cost = 1
+
+        include_foreign_keys, include_backrefs = include_flags(args)
+        if include_backrefs:
+            cost += weights['backrefs']
+        elif include_foreign_keys:
+            cost += weights['foreign_keys']
+
+        try:
+            cost += max(int(args.get('page', 1)) - 1, 0) * weights['page']
+        except ValueError:
+            pass
+
+        for key, value in args.items(multi=True):
+            filter_parts = key.split('__')
+            if len(filter_parts) != 2:
+                continue
+
+            comparison = filter_parts[1]
+            if comparison in ['in', 'notin']:
+                cost += len(value.split(',')) * weights['in_item']
+            elif comparison in weights:
+                cost += weights[comparison]
+
+        return cost
+
+    def check(self, resource):
+        """Returns an error response when the request must be rejected, otherwise None."""
+        response_messages = resource.config.response_messages
+        cost = self.estimate_cost(request.args)
+
+        if cost > self.max_query_cost:
+            return resource.response_json(
+                status_code=400,
+                message=response_messages.ErrorQueryCostExceeded.format(cost, self.max_query_cost)
+            )
+
+        route = request.url_rule.rule if request.url_rule is not None else request.path
+        key = '{}:{}'.format(self.client_key(), route)
+        wait = self.backend.consume(key, cost, self.rate, self.capacity)
+
+        if wait:
+            retry_after = int(math.ceil(wait))
+            response = resource.response_json(
+                status_code=429,
+                message=response_messages.ErrorRateLimited.format(retry_after)
+            )
+            response.headers['Retry-After'] = str(retry_after)
+            return response
+
+        return None
@@ -1,4 +1,5 @@
+from .batch_resource import BaseBatchResource
 from .collection_resource import BaseCollectionResource
 from .single_resource import BaseSingleResource
 
-__all__ = ['BaseCollectionResource', 'BaseResource']
+__all__ = ['BaseBatchResource', 'BaseCollectionResource', 'BaseResource']
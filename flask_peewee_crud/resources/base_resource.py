@@ -4,6 +4,16 @@ from flask import jsonify, request
 from flask.views import MethodView
 
 
+def include_flags(args):
+    """
+    Parses the ``foreign_keys`` and ``backrefs`` query parameters into
+    ``(include_foreign_keys, include_backrefs)``, backrefs imply foreign keys.
+    """
+    include_backrefs = args.get('backrefs') == 'true'
+    include_foreign_keys = include_backrefs or args.get('foreign_keys') == 'true'
+    return include_foreign_keys, include_backrefs
+
+
 class BaseResource(MethodView):
     model = None
     app = None
@@ -13,6 +23,36 @@ class BaseResource(MethodView):
     def log(self):
         return getattr(self.app, 'logger', logging.getLogger(self.__class__.__name__))
 
+    def dispatch_request(self, *args, **kwargs):
+        invalidation_bus = self.config.INVALIDATION_BUS
+        if invalidation_bus is not None:
+            invalidation_bus.poll()
+
+        inspector = self.config.QUERY_INSPECTOR
+        if inspector is None:
+            return super(BaseResource, self).dispatch_request(*args, **kwargs)
+
+        inspector.begin()
+        response = None
+        try:
+            response = super(BaseResource, self).dispatch_request(*args, **kwargs)
+        finally:
+            # Also runs when the handler raises, so the failed request is recorded
+            response = inspector.end(self, response)
+
+        return response
+
+    def publish_change(self):
+        table = self.model._meta.db_table
+
+        inspector = self.config.QUERY_INSPECTOR
+        if inspector is not None:
+            inspector.evict(table)
+
+        invalidation_bus = self.config.INVALIDATION_BUS
+        if invalidation_bus is not None:
+            invalidation_bus.publish(table)
+
     def validate_request(self):
 
         if request.method in ['POST', 'PUT']:
@@ -174,3 +214,15 @@ class BaseResource(MethodView):
                 )
 
         return True
+
+
+class DispatchingResourceMixin(object):
+    """
+    Serves several models from a single view class. ``resources`` maps each endpoint
+    to its ``(model, config)`` pair, which is resolved at the start of every request.
+    """
+    resources = None
+
+    def dispatch_request(self, *args, **kwargs):
+        self.model, self.config = self.resources[request.endpoint]
+        return super(DispatchingResourceMixin, self).dispatch_request(*args, **kwargs)
@@ -0,0 +1,122 @@
+import traceback
+
+from flask import request
+from peewee import JOIN, ForeignKeyField, prefetch
+from playhouse.shortcuts import model_to_dict
+
+from ..coalescing import coalesced
+from ..resources.base_resource import BaseResource, include_flags
+
+
+# Resource for fetching several objects by primary key in one request
+class BaseBatchResource(BaseResource):
+    @coalesced
+    def get(self):
+        ids = [value for value in request.args.get('ids', '').split(',') if value != '']
+        return self.get_batch(ids)
+
+    def post(self):
+        valid_json = self._validate_json()
+        if valid_json is not True:
+            return valid_json
+
+        # Accepts either a list of ids or {"ids": [...]}
+        ids = request.json.get('ids') if isinstance(request.json, dict) else request.json
+        if not isinstance(ids, list):
+            return self.response_json(status_code=400,
+                                      message=self.config.response_messages.ErrorTypeList.format('ids'))
+
+        return self.get_batch(ids)
+
+    def get_batch(self, ids):
+        try:
+            shortcuts = self.model.shortcuts
+            response_messages = self.config.response_messages
+            chunk_size = self.config.BATCH_CHUNK_SIZE
+
+            if len(ids) > self.config.BATCH_MAX_IDS:
+                return self.response_json(
+                    status_code=400,
+                    message=response_messages.ErrorBatchTooLarge.format(len(ids), self.config.BATCH_MAX_IDS)
+                )
+
+            if shortcuts.primary_key_type == 'int':
+                for value in ids:
+                    try:
+                        int(value)
+                    except (ValueError, TypeError):
+                        return self.response_json(status_code=400,
+                                                  message=response_messages.ErrorTypeInteger.format(value))
+                ids = [int(value) for value in ids]
+
+            include_foreign_keys, include_backrefs = include_flags(request.args)
+
+            # Ids and rows are matched on the database value of the primary key, so e.g. uuid strings
+            # match UUID values. Ids that cannot be converted cannot exist and are reported missing.
+            pk_field = self.model._meta.primary_key
+            keys = []
+            for value in ids:
+                try:
+                    keys.append(pk_field.db_value(value))
+                except (ValueError, TypeError):
+                    keys.append(None)
+
+            # Each id is fetched once, in chunks to stay below the database parameter limit
+            unique_keys = []
+            missing = []
+            seen = set()
+            for value, key in zip(ids, keys):
+                if key is None:
+                    missing.append(value)
+                elif key not in seen:
+                    seen.add(key)
+                    unique_keys.append((value, key))
+
+            rows = {}
+            for start in range(0, len(unique_keys), chunk_size):
+                chunk = [key for _, key in unique_keys[start:start + chunk_size]]
+                rows.update(self._fetch(chunk, include_foreign_keys, include_backrefs))
+
+            missing.extend(value for value, key in unique_keys if key not in rows)
+
+            return self.response_json(
+                data={
+                    'results': [rows[key] for key in keys if key in rows],
+                    'missing': missing
+                },
+                status_code=200,
+                message=response_messages.SuccessOk
+            )
+        except Exception as e:
+            self.log.error(traceback.print_exc())
+            return self.response_json(
+                message=str(e),
+                status_code=500
+            )
+
+    def _fetch(self, keys, include_foreign_keys, include_backrefs):
+        model = self.model
+        pk_field = model._meta.primary_key
+        query = model.select().where(getattr(model, pk_field.name) << keys)
+
+        if include_foreign_keys:
+            # Join the first level of related rows so model_to_dict does not query them one by one.
+            # A related model is joined once, self references and deeper levels are left to
+            # model_to_dict (see the batch resource docs)
+            selected = [model]
+            for field in model._meta.fields.values():
+                if isinstance(field, ForeignKeyField) and field.rel_model not in selected:
+                    query = query.switch(model).join(field.rel_model, JOIN.LEFT_OUTER, on=field)
+                    selected.append(field.rel_model)
+            query = query.select(*selected)
+
+        if include_backrefs:
+            # One query per backref instead of one per row and backref
+            query = prefetch(query, *[foreign_key.model_class.select()
+                                      for foreign_key in model._meta.reverse_rel.values()])
+
+        return dict(
+            (pk_field.db_value(getattr(row, pk_field.name)),
+             model_to_dict(row, recurse=include_foreign_keys, backrefs=include_backrefs))
+            for row in query
+        )
@@ -5,7 +5,8 @@ from math import ceil
 from flask import request
 from playhouse.shortcuts import model_to_dict
 
-from ..resources.base_resource import BaseResource
+from ..coalescing import coalesced
+from ..resources.base_resource import BaseResource, include_flags
 
 
 def collection_filter(func):
@@ -26,6 +27,22 @@ def collection_filter(func):
 
             filter_parts = key.split('__')
             field = filter_parts[0]
+
+            # Full-text search over every search field, or a single one with field__search
+            search_index = shortcuts.search_index
+            if (key == 'search' and search_index is not None) or filter_parts[1:] == ['search']:
+                search_field = None if key == 'search' else field
+                if ('search' not in self.config.FILTER_OPTIONS or search_index is None or
+                        (search_field is not None and search_field not in search_index.fields)):
+                    return self.response_json(
+                        status_code=400,
+                        message=response_messages.ErrorSearchNotEnabled.format(
+                            key, search_index.fields if search_index is not None else [])
+                    )
+
+                query = search_index.filter(query, value, search_field)
+                continue
+
             comparison = '='
             value = value[0]  # Value comes in as an array with a single argument? TODO: Re-evaluate this!
 
@@ -82,6 +99,9 @@ def collection_filter(func):
             elif comparison == 'notin':
                 query = query.where(~(model_field << value))
 
+        if self.config.QUERY_INSPECTOR is not None:
+            self.config.QUERY_INSPECTOR.explain(model, query)
+
         kwargs['filtered_results'] = query
 
         return func(self, *args, **kwargs)
@@ -89,6 +109,19 @@ def collection_filter(func):
     return wrapped
 
 
+def rate_limited(func):
+    def wrapped(self, *args, **kwargs):
+        rate_limiter = self.config.RATE_LIMITER
+        if rate_limiter is not None:
+            rejected = rate_limiter.check(self)
+            if rejected is not None:
+                return rejected
+
+        return func(self, *args, **kwargs)
+
+    return wrapped
+
+
 # Helper function, takes in a database field and an input value to make sure the input is the correct type for the db
 def _validate_field_type(self, field, value):
     expected_field_type = field.db_field
@@ -118,6 +151,8 @@ def _validate_field_type(self, field, value):
 
 # Resource for multiple objects
 class BaseCollectionResource(BaseResource):
+    @rate_limited
+    @coalesced
     @collection_filter
     def get(self, **kwargs):
         try:
@@ -130,14 +165,7 @@ class BaseCollectionResource(BaseResource):
                 return self.response_json(status_code=400,
                                           message=response_messages.ErrorTypeInteger.format('page'))
 
-            include_backrefs = False
-            include_foreign_keys = False
-
-            if 'backrefs' in request.args and request.args['backrefs'][0] == 'true':
-                include_backrefs = True
-                include_foreign_keys = True
-            elif 'foreign_keys' in request.args and request.args['foreign_keys'][0] == 'true':
-                include_foreign_keys = True
+            include_foreign_keys, include_backrefs = include_flags(request.args)
 
             results = []
             data = kwargs.get('filtered_results')
@@ -166,7 +194,13 @@ class BaseCollectionResource(BaseResource):
             return valid_request
 
         try:
-            result = self.model.create(**request.json)
+            # The row and its search index entry are written together or not at all
+            with self.model._meta.database.atomic():
+                result = self.model.create(**request.json)
+                if self.model.shortcuts.search_index is not None:
+                    self.model.shortcuts.search_index.update(result)
+            self.publish_change()
+
             return self.response_json(data=model_to_dict(result),
                                       status_code=200,
                                       message=self.config.response_messages.SuccessRowCreated.format(result.id)
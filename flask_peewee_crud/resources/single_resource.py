@@ -3,25 +3,20 @@ import traceback
 from flask import request
 from playhouse.shortcuts import model_to_dict
 
-from ..resources.base_resource import BaseResource
+from ..coalescing import coalesced
+from ..resources.base_resource import BaseResource, include_flags
 
 
 # Resource for a single object
 class BaseSingleResource(BaseResource):
+    @coalesced
     def get(self, **kwargs):
         try:
             shortcuts = self.model.shortcuts
             response_messages = self.config.response_messages
             primary_key = kwargs.get(shortcuts.primary_key)
 
-            include_backrefs = False
-            include_foreign_keys = False
-
-            if 'backrefs' in request.args and request.args['backrefs'][0] == 'true':
-                include_backrefs = True
-                include_foreign_keys = True
-            elif 'foreign_keys' in request.args and request.args['foreign_keys'][0] == 'true':
-                include_foreign_keys = True
+            include_foreign_keys, include_backrefs = include_flags(request.args)
 
             data = self.get_model(primary_key)
 
@@ -68,7 +63,11 @@ class BaseSingleResource(BaseResource):
             for key, value in request_data:
                 setattr(resource, key, value)
 
-            resource.save()
+            with self.model._meta.database.atomic():
+                resource.save()
+                if shortcuts.search_index is not None:
+                    shortcuts.search_index.update(resource)
+            self.publish_change()
 
             return self.response_json(
                 data=model_to_dict(resource),
@@ -97,7 +96,11 @@ class BaseSingleResource(BaseResource):
                     message=response_messages.ErrorDoesNotExist.format(primary_key)
                 )
 
-            resource.delete_instance()
+            with self.model._meta.database.atomic():
+                resource.delete_instance()
+                if shortcuts.search_index is not None:
+                    shortcuts.search_index.delete(primary_key)
+            self.publish_change()
 
             return self.response_json(
                 status_code=200,
@@ -0,0 +1,209 @@
+import re
+import threading
+
+from peewee import SQL, BareField, Clause, IntegerField, Model, PostgresqlDatabase, SqliteDatabase
+
+
+def _quote(name):
+    return '"{}"'.format(name.replace('"', '""'))
+
+
+class SearchIndex(object):
+    """
+    Full-text index over the ``search_fields`` of a model. ``create`` builds it and is safe to call
+    more than once, from startup code or a migration, see ``create_search_indexes``. Indexes with
+    ``create_on_first_use`` are otherwise created by the first search or write.
+    """
+
+    create_on_first_use = True
+
+    def __init__(self, model, fields):
+        for field in fields:
+            if field not in model._meta.fields:
+                raise ValueError('Search field \'{}\' does not exist on {}'.format(field, model.__name__))
+
+        self.model = model
+        self.fields = list(fields)
+        self.database = model._meta.database
+        self.table = model._meta.db_table
+        self.columns = [model._meta.fields[field].db_column for field in self.fields]
+        self.primary_key = model._meta.primary_key
+        self._created = False
+        self._lock = threading.Lock()
+
+    def ensure_created(self):
+        if self.create_on_first_use and not self._created:
+            with self._lock:
+                if not self._created:
+                    self.create()
+                    self._created = True
+
+    def create(self):
+        raise NotImplementedError
+
+    def update(self, instance):
+        """Called after a row is created or updated through the generated resources."""
+        pass
+
+    def delete(self, pk):
+        """Called after a row is deleted through the generated resources."""
+        pass
+
+    def filter(self, query, text, field=None):
+        """Restricts ``query`` to rows matching ``text`` and orders them by rank."""
+        raise NotImplementedError
+
+
+class SqliteSearchIndex(SearchIndex):
+    """
+    Rows are copied into an FTS5 virtual table named ``<table>_search`` keyed by rowid, which
+    searches join once to filter with MATCH and order by its rank column.
+    """
+
+    def __init__(self, model, fields):
+        super(SqliteSearchIndex, self).__init__(model, fields)
+        if model.shortcuts.primary_key_type != 'int':
+            raise ValueError('Full-text search on SQLite requires an integer primary key')
+
+        name = self.table + '_search'
+        self.fts_table = _quote(name)
+
+        # Model over the FTS5 table so searches can join it, ``match`` is the hidden column
+        # named after the table that MATCH is applied to
+        self.search_model = type(str(model.__name__ + 'Search'), (Model,), {
+            '__module__': model.__module__,
+            'rowid': IntegerField(primary_key=True),
+            'match': BareField(db_column=name),
+            'rank': BareField(),
+            'Meta': type(str('Meta'), (object,), {'database': self.database, 'db_table': name})
+        })
+
+    def create(self):
+        name = self.table + '_search'
+        columns = ', '.join(_quote(column) for column in self.columns)
+
+        # Check, create and backfill in one transaction, so a crash cannot leave an empty or
+        # partial index behind and a concurrent worker cannot fill it twice
+        with self.database.atomic():
+            exists = self.database.execute_sql(
+                'SELECT 1 FROM sqlite_master WHERE type = \'table\' AND name = ?', (name,)).fetchone()
+            if exists:
+                return
+
+            self.database.execute_sql('CREATE VIRTUAL TABLE IF NOT EXISTS {} USING fts5({})'.format(
+                self.fts_table, columns))
+            self.database.execute_sql('INSERT INTO {} (rowid, {}) SELECT {}, {} FROM {}'.format(
+                self.fts_table, columns, _quote(self.primary_key.db_column), columns, _quote(self.table)))
+
+    def update(self, instance):
+        self.ensure_created()
+        pk = getattr(instance, self.primary_key.name)
+        values = [getattr(instance, field) for field in self.fields]
+        columns = ', '.join(_quote(column) for column in self.columns)
+        placeholders = ', '.join('?' for _ in range(len(values) + 1))
+
+        with self.database.atomic():
+            self.database.execute_sql('DELETE FROM {} WHERE rowid = ?'.format(self.fts_table), (pk,))
+            self.database.execute_sql('INSERT INTO {} (rowid, {}) VALUES ({})'.format(
+                self.fts_table, columns, placeholders), [pk] + values)
+
+    def delete(self, pk):
+        self.ensure_created()
+        self.database.execute_sql('DELETE FROM {} WHERE rowid = ?'.format(self.fts_table), (pk,))
+
+    def match_expression(self, text, field=None):
+        # Every term is matched as a quoted string, so user input cannot use the FTS5 query syntax
+        terms = ['"{}"'.format(term.replace('"', '""')) for term in text.split()]
+        if field is not None:
+            column = _quote(self.columns[self.fields.index(field)])
+            terms = ['{} : {}'.format(column, term) for term in terms]
+
+        return ' AND '.join(terms)
+
+    def filter(self, query, text, field=None):
+        self.ensure_created()
+        match = self.match_expression(text, field)
+        if not match:
+            return query
+
+        # An alias per call, so search and field__search can be combined
+        search = self.search_model.alias()
+        pk_field = getattr(self.model, self.primary_key.name)
+
+        return (query
+                .switch(self.model)
+                .join(search, on=(search.rowid == pk_field))
+                .where(Clause(search.match, SQL('MATCH ?', match)))
+                .order_by(search.rank))
+
+
+class PostgresSearchIndex(SearchIndex):
+    """
+    Uses GIN expression indexes on ``to_tsvector`` of the search fields, one for all of them
+    and one per field. Postgres keeps them up to date, so writes need no extra work.
+
+    Building the indexes can take long on large tables, so it is never done on the request path:
+    call ``create`` (or ``create_search_indexes``) at startup or from a migration. Indexes are
+    built ``CONCURRENTLY`` so writes are not blocked, which must run outside a transaction.
+    """
+
+    create_on_first_use = False
+
+    def __init__(self, model, fields, language='english'):
+        super(PostgresSearchIndex, self).__init__(model, fields)
+        if not re.match(r'^\w+$', language):
+            raise ValueError('Invalid full-text search language \'{}\''.format(language))
+
+        self.language = language
+
+    def _document_sql(self, columns):
+        parts = ['coalesce({}::text, \'\')'.format(_quote(column)) for column in columns]
+        return 'to_tsvector(\'{}\', {})'.format(self.language, ' || \' \' || '.join(parts))
+
+    def _document_clause(self, fields):
+        # Same expression as the index, built from model fields so the query alias is used
+        nodes = [SQL('to_tsvector(\'{}\','.format(self.language))]
+        for i, field in enumerate(fields):
+            if i:
+                nodes.append(SQL('|| \' \' ||'))
+            nodes.extend([SQL('coalesce('), getattr(self.model, field), SQL('::text, \'\')')])
+        nodes.append(SQL(')'))
+
+        return Clause(*nodes)
+
+    def create(self):
+        indexes = [(self.table + '_search', self.columns)]
+        indexes.extend((self.table + '_' + column + '_search', [column]) for column in self.columns)
+
+        for name, columns in indexes:
+            self.database.execute_sql('CREATE INDEX CONCURRENTLY IF NOT EXISTS {} ON {} USING GIN (({}))'.format(
+                _quote(name), _quote(self.table), self._document_sql(columns)))
+
+    def filter(self, query, text, field=None):
+        if not text.split():
+            return query
+
+        document = self._document_clause([field] if field is not None else self.fields)
+        ts_query = 'plainto_tsquery(\'{}\', %s)'.format(self.language)
+        matches = Clause(document, SQL('@@ ' + ts_query, text))
+        rank = Clause(SQL('ts_rank('), document, SQL(', ' + ts_query + ')', text))
+
+        return query.where(matches).order_by(rank.desc())
+
+
+def create_search_index(model, fields, language='english'):
+    database = model._meta.database
+    if isinstance(database, SqliteDatabase):
+        return SqliteSearchIndex(model, fields)
+    if isinstance(database, PostgresqlDatabase):
+        return PostgresSearchIndex(model, fields, language)
+
+    raise ValueError('Full-text search is only supported on SQLite and Postgres databases')
+
+
+def create_search_indexes(model_array):
+    """Creates the search indexes of registered models, to be called at startup or from a migration."""
+    for model in model_array:
+        shortcuts = getattr(model, 'shortcuts', None)
+        if shortcuts is not None and shortcuts.search_index is not None:
+            shortcuts.search_index.create()
@@ -0,0 +1,73 @@
+import json
+
+import pytest
+from flask import Flask
+from peewee import CharField, ForeignKeyField, Model, SqliteDatabase
+
+from flask_peewee_crud import CrudConfig, generate_crud
+
+# Initialized per test with a file, so requests served from other threads see the same data
+db = SqliteDatabase(None)
+
+
+class BaseModel(Model):
+    class Meta:
+        database = db
+
+
+class Job(BaseModel):
+    name = CharField()
+
+
+class Person(BaseModel):
+    search_fields = ['name', 'email']
+
+    name = CharField(max_length=64)
+    email = CharField(null=True)
+    job = ForeignKeyField(Job, null=True, related_name='people')
+
+
+class Tag(BaseModel):
+    code = CharField(primary_key=True)
+    label = CharField()
+
+
+MODELS = [Job, Person, Tag]
+
+
+def load(response):
+    return json.loads(response.data.decode('utf-8'))
+
+
+def send_json(client, method, url, data):
+    return getattr(client, method)(url, data=json.dumps(data), content_type='application/json')
+
+
+@pytest.fixture
+def database(tmpdir):
+    db.init(str(tmpdir.join('test.db')))
+    db.create_tables(MODELS)
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def config():
+    return CrudConfig()
+
+
+def make_app(config, models=MODELS):
+    app = Flask(__name__)
+    app.config.crud_config = config
+    generate_crud(app, models)
+    return app
+
+
+@pytest.fixture
+def app(database, config):
+    return make_app(config)
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,68 @@
+from peewee import CharField
+
+from flask_peewee_crud import generate_crud
+from flask_peewee_crud.config import CrudShortcuts
+from tests.conftest import BaseModel, Job, Person, load, make_app
+
+
+class Team(BaseModel):
+    name = CharField()
+
+
+def test_base_route_lists_routes_and_fields(client):
+    response = client.get('/')
+    routes = load(response)['data']['routes']
+
+    assert response.status_code == 200
+    assert response.mimetype == 'application/json'
+    assert sorted(routes) == ['job', 'person', 'tag']
+    assert routes['person']['route_url'] == '/person'
+    assert {'field_name': 'name', 'field_type': 'string', 'is_required': True} in routes['person']['fields']
+    assert 'filter_options' not in routes['person']
+
+
+def test_base_route_is_cached_with_an_etag(client):
+    response = client.get('/')
+    etag = response.headers['ETag']
+
+    assert client.get('/').data == response.data
+    assert client.get('/').headers['ETag'] == etag
+
+    not_modified = client.get('/', headers={'If-None-Match': etag})
+    assert not_modified.status_code == 304
+    assert not_modified.data == b''
+
+
+def test_base_route_is_extended_by_another_generate_crud_call(database, config):
+    app = make_app(config, [Job])
+    generate_crud(app, [Person])
+
+    assert sorted(load(app.test_client().get('/'))['data']['routes']) == ['job', 'person']
+
+
+def test_base_route_is_rebuilt_when_models_are_registered_again(app, client):
+    # generate_crud registers models on the base route this way, Flask does not allow
+    # calling it again once the app served a request
+    base_route = app.extensions['flask_peewee_crud_base_route']
+    etag = client.get('/').headers['ETag']
+
+    Team.shortcuts = CrudShortcuts(Team)
+    base_route.register([Team])
+    response = client.get('/')
+
+    assert response.headers['ETag'] != etag
+    assert 'team' in load(response)['data']['routes']
+    assert client.get('/', headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_extended_schema(database, config):
+    config.BASE_ROUTE_EXTENDED_SCHEMA = True
+    routes = load(make_app(config, [Job, Person]).test_client().get('/'))['data']['routes']
+    fields = dict((field['field_name'], field) for field in routes['person']['fields'])
+
+    assert fields['name']['max_length'] == 64
+    assert fields['name']['nullable'] is False
+    assert fields['email']['nullable'] is True
+    assert fields['job']['foreign_key'] == 'job'
+    assert fields['id']['foreign_key'] is None
+    assert 'in' in routes['person']['filter_options']
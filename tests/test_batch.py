@@ -0,0 +1,92 @@
+import pytest
+
+from flask_peewee_crud.inspection import QueryInspector
+from tests.conftest import Job, Person, Tag, load, make_app, send_json
+
+
+@pytest.fixture
+def people(database):
+    job = Job.create(name='runner')
+    return [Person.create(name=name, job=job) for name in ['sanic', 'tails', 'knuckles']]
+
+
+def names(response):
+    return [row['name'] for row in load(response)['data']['results']]
+
+
+def test_get_preserves_order_and_reports_missing_ids(client, people):
+    response = client.get('/person/_batch?ids={},{},99,{},98,99'.format(people[2].id, people[0].id, people[2].id))
+    data = load(response)['data']
+
+    assert response.status_code == 200
+    assert [row['name'] for row in data['results']] == ['knuckles', 'sanic', 'knuckles']
+    assert data['missing'] == [99, 98]
+
+
+def test_post_accepts_a_list_or_an_object(client, people):
+    ids = [people[1].id, people[0].id]
+
+    assert names(send_json(client, 'post', '/person/_batch', ids)) == ['tails', 'sanic']
+    assert names(send_json(client, 'post', '/person/_batch', {'ids': ids})) == ['tails', 'sanic']
+    assert send_json(client, 'post', '/person/_batch', {'ids': 1}).status_code == 400
+
+
+def test_integer_ids_are_validated(client, people):
+    assert client.get('/person/_batch?ids=1,abc').status_code == 400
+
+
+def test_string_primary_keys(client, database):
+    Tag.create(code='a', label='first')
+    Tag.create(code='b', label='second')
+
+    data = load(client.get('/tag/_batch?ids=b,zz,a'))['data']
+
+    assert [row['label'] for row in data['results']] == ['second', 'first']
+    assert data['missing'] == ['zz']
+
+
+def test_too_many_ids_are_rejected(database, config, people):
+    config.BATCH_MAX_IDS = 2
+    client = make_app(config).test_client()
+
+    assert client.get('/person/_batch?ids=1,2,3').status_code == 400
+
+
+def test_ids_are_fetched_in_chunks(database, config, people):
+    inspector = QueryInspector(budget=0)
+    config.QUERY_INSPECTOR = inspector
+    config.BATCH_CHUNK_SIZE = 2
+    client = make_app(config).test_client()
+
+    assert names(client.get('/person/_batch?ids=3,2,1,4')) == ['knuckles', 'tails', 'sanic']
+    assert inspector.reports[-1]['query_count'] == 2
+
+
+def test_foreign_keys_are_loaded_in_one_query(database, config, people):
+    inspector = QueryInspector(budget=0)
+    config.QUERY_INSPECTOR = inspector
+    client = make_app(config).test_client()
+
+    results = load(client.get('/person/_batch?ids=1,2,3&foreign_keys=true'))['data']['results']
+
+    assert [row['job']['name'] for row in results] == ['runner'] * 3
+    assert inspector.reports[-1]['query_count'] == 1
+
+
+def test_backrefs_are_prefetched(database, config, people):
+    Job.create(name='idle')
+    inspector = QueryInspector(budget=0)
+    config.QUERY_INSPECTOR = inspector
+    client = make_app(config).test_client()
+
+    results = load(client.get('/job/_batch?ids=1,2&backrefs=true'))['data']['results']
+
+    assert [[person['name'] for person in row['people']] for row in results] == [['sanic', 'tails', 'knuckles'], []]
+    assert inspector.reports[-1]['query_count'] == 2
+
+
+def test_flags_match_the_single_resource(client, people):
+    batch = load(client.get('/person/_batch?ids=1&foreign_keys=true'))['data']['results'][0]
+    single = load(client.get('/person/1?foreign_keys=true'))['data']
+
+    assert batch == single
@@ -0,0 +1,146 @@
+import threading
+import time
+
+import pytest
+
+from flask_peewee_crud.coalescing import SingleFlight, request_key
+from tests.conftest import Person, load
+
+
+def _wait_for(condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline
+        time.sleep(0.001)
+
+
+def _run_concurrently(single_flight, key, func, count):
+    results = [None] * count
+    errors = [None] * count
+
+    def run(i):
+        try:
+            results[i] = single_flight.do(key, func)
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+
+    return threads, results, errors
+
+
+def test_concurrent_calls_share_one_computation():
+    single_flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return b'body'
+
+    threads, results, errors = _run_concurrently(single_flight, 'key', compute, 8)
+    _wait_for(lambda: single_flight.shared == 7)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert errors == [None] * 8
+    assert sorted(shared for _, shared in results) == [False] + [True] * 7
+    assert all(result == b'body' for result, _ in results)
+
+    stats = single_flight.stats()
+    assert stats['executed'] == 1
+    assert stats['shared'] == 7
+    assert stats['in_flight'] == 0
+    assert stats['dedup_ratio'] == pytest.approx(7 / 8.0)
+
+
+def test_different_keys_are_not_shared():
+    single_flight = SingleFlight()
+
+    assert single_flight.do('a', lambda: 1) == (1, False)
+    assert single_flight.do('b', lambda: 2) == (2, False)
+    assert single_flight.stats()['executed'] == 2
+
+
+def test_leader_error_is_raised_to_every_caller():
+    single_flight = SingleFlight()
+    release = threading.Event()
+
+    def compute():
+        release.wait(5)
+        raise RuntimeError('boom')
+
+    threads, results, errors = _run_concurrently(single_flight, 'key', compute, 4)
+    _wait_for(lambda: single_flight.shared == 3)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert all(isinstance(error, RuntimeError) for error in errors)
+    assert single_flight.stats()['in_flight'] == 0
+
+
+def test_waiting_caller_computes_locally_after_timeout():
+    single_flight = SingleFlight(timeout=0.05)
+    release = threading.Event()
+
+    leader = threading.Thread(target=single_flight.do, args=('key', lambda: release.wait(5)))
+    leader.start()
+    _wait_for(lambda: single_flight.stats()['in_flight'] == 1)
+
+    assert single_flight.do('key', lambda: 'local') == ('local', False)
+    release.set()
+    leader.join()
+
+    stats = single_flight.stats()
+    assert stats['timeouts'] == 1
+    assert stats['executed'] == 2
+    assert stats['shared'] == 0
+
+
+def test_request_key_tells_resources_of_one_model_apart(app):
+    with app.test_request_context('/person?page=1'):
+        collection_key = request_key(Person)
+    with app.test_request_context('/person/_batch?page=1'):
+        batch_key = request_key(Person)
+
+    assert collection_key != batch_key
+
+
+def test_concurrent_collection_and_batch_requests_are_not_shared(app, config, monkeypatch):
+    for name in ['a', 'b', 'c']:
+        Person.create(name=name)
+
+    # Hold the first computation until the second request joins, if it would be shared
+    single_flight = SingleFlight(timeout=0.5)
+    config.REQUEST_COALESCER = single_flight
+    do = single_flight.do
+
+    def slow_do(key, func):
+        def slow_func():
+            result = func()
+            time.sleep(0.2)
+            return result
+        return do(key, slow_func)
+
+    monkeypatch.setattr(single_flight, 'do', slow_do)
+
+    responses = {}
+
+    def get(url):
+        responses[url] = load(app.test_client().get(url))
+
+    threads = [threading.Thread(target=get, args=(url,)) for url in ['/person', '/person/_batch']]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(responses['/person']['data']) == 3
+    assert responses['/person/_batch']['data'] == {'results': [], 'missing': []}
+    assert single_flight.stats()['shared'] == 0
@@ -0,0 +1,107 @@
+import pytest
+
+from flask_peewee_crud.inspection import QueryInspector
+from tests.conftest import Person, load, make_app, send_json
+
+
+@pytest.fixture
+def people(database):
+    return [Person.create(name=name) for name in ['sanic', 'tails', 'knuckles']]
+
+
+def inspected_client(config, **kwargs):
+    inspector = QueryInspector(**kwargs)
+    config.QUERY_INSPECTOR = inspector
+    return inspector, make_app(config).test_client()
+
+
+def test_requests_within_budget_are_not_recorded(database, config, people):
+    inspector, client = inspected_client(config, budget=2)
+
+    assert client.get('/person').status_code == 200
+    assert list(inspector.reports) == []
+
+
+def test_requests_over_budget_are_recorded(database, config, people):
+    inspector, client = inspected_client(config, budget=1)
+
+    assert client.get('/person').status_code == 200
+
+    report = inspector.reports[-1]
+    assert report['path'] == '/person?'
+    assert report['query_count'] == 2
+    assert report['failed'] is False
+
+
+def test_requests_over_budget_fail_when_configured(database, config, people):
+    inspector, client = inspected_client(config, budget=1, raise_on_exceed=True)
+
+    response = client.get('/person')
+
+    assert response.status_code == 500
+    assert load(response)['message'] == 'Request ran 2 SQL queries, the budget is 1'
+
+
+def test_failed_requests_are_recorded_and_reset(database, config, people, monkeypatch):
+    inspector, client = inspected_client(config, budget=10)
+
+    def fail(query, text, field=None):
+        raise RuntimeError('boom')
+
+    monkeypatch.setattr(Person.shortcuts.search_index, 'filter', fail)
+    assert client.get('/person?search=sanic').status_code == 500
+    assert inspector.reports[-1]['failed'] is True
+    assert inspector._local.queries is None
+
+    Person.select().count()
+    assert inspector._local.queries is None
+
+
+def test_full_scans_of_large_tables_are_flagged(database, config, people):
+    inspector, client = inspected_client(config, explain=True, large_table_rows=3)
+
+    assert client.get('/person?id=1').status_code == 200
+    assert list(inspector.reports) == []
+
+    assert client.get('/person?email__null=1').status_code == 200
+    warning = inspector.reports[-1]['warnings'][0]
+    assert warning['table'] == 'person'
+    assert warning['rows'] == 3
+
+
+def test_full_scans_of_small_tables_are_not_flagged(database, config, people):
+    inspector, client = inspected_client(config, explain=True, large_table_rows=4)
+
+    assert client.get('/person?email__null=1').status_code == 200
+    assert list(inspector.reports) == []
+
+
+def test_row_counts_are_evicted_on_writes(database, config, people):
+    inspector, client = inspected_client(config, explain=True, large_table_rows=4)
+
+    client.get('/person?email__null=1')
+    assert inspector._row_counts == {'person': 3}
+
+    assert send_json(client, 'post', '/person', {'name': 'amy'}).status_code == 200
+    assert inspector._row_counts == {}
+
+    client.get('/person?email__null=1')
+    assert inspector.reports[-1]['warnings'][0]['rows'] == 4
+
+
+def test_route_is_opt_in(database, config, people):
+    inspector, client = inspected_client(config, budget=0)
+
+    assert client.get('/_crud/queries').status_code == 404
+
+
+def test_route_serves_local_clients_only(database, config, people):
+    inspector, client = inspected_client(config, budget=0, route='/_crud/queries')
+    client.get('/person')
+
+    data = load(client.get('/_crud/queries'))['data']
+    assert [report['path'] for report in data['requests']] == ['/person?']
+    assert data['coalescing'] == []
+
+    response = client.get('/_crud/queries', environ_base={'REMOTE_ADDR': '10.0.0.1'})
+    assert response.status_code == 403
@@ -0,0 +1,92 @@
+import pytest
+
+from flask_peewee_crud import invalidation
+from flask_peewee_crud.invalidation import LocalInvalidationBus, SqliteInvalidationBus
+
+
+@pytest.fixture
+def path(tmpdir):
+    return str(tmpdir.join('invalidations.db'))
+
+
+def test_local_bus_notifies_subscribers():
+    bus = LocalInvalidationBus()
+    events = []
+    bus.subscribe(events.append)
+    bus.subscribe(events.append)
+
+    bus.publish('person')
+    bus.poll()
+
+    assert events == ['person']
+
+
+def test_sqlite_bus_delivers_events_to_other_instances(path):
+    publisher = SqliteInvalidationBus(path, poll_interval=0)
+    consumer = SqliteInvalidationBus(path, poll_interval=0)
+    published, consumed = [], []
+    publisher.subscribe(published.append)
+    consumer.subscribe(consumed.append)
+    consumer.poll()
+
+    publisher.publish('person')
+    publisher.publish('job')
+
+    assert published == ['person', 'job']
+    assert consumed == []
+
+    consumer.poll()
+    assert consumed == ['person', 'job']
+
+    # Events are delivered once, and never back to their publisher
+    consumer.poll()
+    publisher.poll()
+    assert consumed == ['person', 'job']
+    assert published == ['person', 'job']
+
+
+def test_sqlite_bus_ignores_events_from_before_it_connected(path):
+    SqliteInvalidationBus(path).publish('person')
+
+    consumer = SqliteInvalidationBus(path, poll_interval=0)
+    consumed = []
+    consumer.subscribe(consumed.append)
+    consumer.poll()
+
+    assert consumed == []
+
+
+def test_sqlite_bus_poll_is_throttled(path, monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(invalidation, '_now', lambda: now[0])
+
+    publisher = SqliteInvalidationBus(path)
+    consumer = SqliteInvalidationBus(path, poll_interval=1.0)
+    consumed = []
+    consumer.subscribe(consumed.append)
+    consumer.poll()
+
+    publisher.publish('person')
+    now[0] = 0.5
+    consumer.poll()
+    assert consumed == []
+
+    now[0] = 1.0
+    consumer.poll()
+    assert consumed == ['person']
+
+
+def test_sqlite_bus_deletes_old_events(path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(invalidation.time, 'time', lambda: now[0])
+
+    bus = SqliteInvalidationBus(path, retention=10, prune_every=2)
+    bus.publish('person')
+    now[0] = 1011.0
+    bus.publish('job')
+    now[0] = 1022.0
+    bus.publish('person')
+
+    # Only every second send prunes
+    rows = bus._get_connection().execute('SELECT model FROM crud_invalidations ORDER BY id').fetchall()
+    assert rows == [('job',), ('person',)]
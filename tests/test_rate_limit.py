@@ -0,0 +1,69 @@
+import pytest
+from werkzeug.datastructures import MultiDict
+
+from flask_peewee_crud import rate_limit
+from flask_peewee_crud.rate_limit import MemoryRateLimitBackend, RateLimiter
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(rate_limit, '_now', lambda: now[0])
+    return now
+
+
+def test_bucket_is_drained_and_refilled(clock):
+    backend = MemoryRateLimitBackend()
+
+    assert backend.consume('client', 2, rate=1, capacity=4) == 0
+    assert backend.consume('client', 2, rate=1, capacity=4) == 0
+    assert backend.consume('client', 2, rate=1, capacity=4) == 2
+
+    clock[0] = 1.0
+    assert backend.consume('client', 2, rate=1, capacity=4) == 1
+
+    clock[0] = 2.0
+    assert backend.consume('client', 2, rate=1, capacity=4) == 0
+
+
+def test_bucket_refill_is_capped_at_capacity(clock):
+    backend = MemoryRateLimitBackend()
+    backend.consume('client', 4, rate=1, capacity=4)
+
+    clock[0] = 100.0
+    assert backend.consume('client', 4, rate=1, capacity=4) == 0
+    assert backend.consume('client', 1, rate=1, capacity=4) == 1
+
+
+def test_buckets_are_evicted_past_max_keys(clock):
+    backend = MemoryRateLimitBackend(max_keys=2)
+    for key in ['a', 'b', 'c', 'd', 'e']:
+        backend.consume(key, 1, rate=1, capacity=10)
+
+    assert list(backend._buckets) == ['d', 'e']
+
+
+def test_least_recently_used_bucket_is_evicted_first(clock):
+    backend = MemoryRateLimitBackend(max_keys=2)
+    backend.consume('a', 1, rate=1, capacity=10)
+    backend.consume('b', 1, rate=1, capacity=10)
+    backend.consume('a', 1, rate=1, capacity=10)
+    backend.consume('c', 1, rate=1, capacity=10)
+
+    assert list(backend._buckets) == ['a', 'c']
+
+
+def test_max_query_cost_cannot_exceed_capacity():
+    with pytest.raises(ValueError):
+        RateLimiter(capacity=10, max_query_cost=20)
+
+
+def test_estimate_cost():
+    limiter = RateLimiter()
+
+    assert limiter.estimate_cost(MultiDict()) == 1
+    assert limiter.estimate_cost(MultiDict([('foreign_keys', 'true')])) == 3
+    assert limiter.estimate_cost(MultiDict([('backrefs', 'true'), ('foreign_keys', 'true')])) == 6
+    assert limiter.estimate_cost(MultiDict([('name__contains', 'a')])) == 4
+    assert limiter.estimate_cost(MultiDict([('id__in', '1,2,3,4,5,6,7,8,9,10')])) == pytest.approx(2)
+    assert limiter.estimate_cost(MultiDict([('page', '11')])) == pytest.approx(2)
@@ -0,0 +1,67 @@
+import pytest
+
+from flask_peewee_crud.config import CrudShortcuts
+from flask_peewee_crud.crud_generation import _fast_plural
+from tests.conftest import Job, Person, Tag, load, make_app, send_json
+
+
+def test_shortcuts_are_computed_at_registration():
+    shortcuts = CrudShortcuts(Person)
+
+    assert shortcuts.primary_key == 'id'
+    assert shortcuts.primary_key_type == 'int'
+    assert sorted(shortcuts.fields) == ['email', 'id', 'job', 'name']
+    assert sorted(shortcuts.editable_fields) == ['email', 'job', 'name']
+    assert shortcuts.required_fields == ['name']
+    assert shortcuts.base_uri == '/person'
+
+
+def test_string_primary_keys_use_the_string_converter():
+    shortcuts = CrudShortcuts(Tag)
+
+    assert shortcuts.primary_key == 'code'
+    assert shortcuts.primary_key_type == 'string'
+
+
+@pytest.mark.parametrize('word, plural', [
+    ('job', 'jobs'),
+    ('person', 'persons'),
+    ('box', 'boxes'),
+    ('match', 'matches'),
+    ('category', 'categories'),
+    ('day', 'days'),
+])
+def test_fast_plural(word, plural):
+    assert _fast_plural(word) == plural
+
+
+def test_default_registration_names_endpoints_with_inflect(app):
+    assert 'people' in app.view_functions
+    assert 'jobs' in app.view_functions
+    assert 'person' in app.view_functions
+    assert 'person_batch' in app.view_functions
+
+
+def test_fast_registration_shares_one_view_per_resource_kind(database, config):
+    config.FAST_REGISTRATION = True
+    app = make_app(config)
+    views = app.view_functions
+
+    assert views['persons'] is views['jobs'] is views['tags']
+    assert views['person'] is views['job'] is views['tag']
+    assert views['person_batch'] is views['job_batch'] is views['tag_batch']
+    assert views['person'] is not views['persons']
+
+
+def test_fast_registration_dispatches_to_each_model(database, config):
+    config.FAST_REGISTRATION = True
+    client = make_app(config).test_client()
+
+    job = load(send_json(client, 'post', '/job', {'name': 'runner'}))['data']
+    person = load(send_json(client, 'post', '/person', {'name': 'sanic', 'job': job['id']}))['data']
+
+    assert load(client.get('/job/{}'.format(job['id'])))['data'] == job
+    assert load(client.get('/person/{}'.format(person['id'])))['data']['name'] == 'sanic'
+    assert [row['name'] for row in load(client.get('/person'))['data']] == ['sanic']
+    assert load(client.get('/job/_batch?ids={}'.format(job['id'])))['data']['results'] == [job]
+    assert client.get('/tag/missing').status_code == 404
@@ -0,0 +1,86 @@
+import pytest
+
+from tests.conftest import Job, Person, load, make_app, send_json
+
+
+@pytest.fixture
+def people(database):
+    # 'hedgehog' is most relevant in the shortest text that repeats it
+    return [
+        Person.create(name='sanic hedgehog', email='sanic@example.com'),
+        Person.create(name='hedgehog hedgehog', email='hedgehog@example.com'),
+        Person.create(name='tails', email='tails@example.com'),
+        Person.create(name='knuckles the echidna and not a hedgehog at all', email=None),
+    ]
+
+
+def ids(response):
+    return [row['id'] for row in load(response)['data']]
+
+
+def test_search_is_rank_ordered(client, people):
+    response = client.get('/person?search=hedgehog')
+
+    assert response.status_code == 200
+    assert ids(response) == [people[1].id, people[0].id, people[3].id]
+
+
+def test_search_matches_every_term(client, people):
+    assert ids(client.get('/person?search=sanic hedgehog')) == [people[0].id]
+    assert ids(client.get('/person?search=sonic')) == []
+
+
+def test_field_search_is_restricted_to_the_field(client, people):
+    assert ids(client.get('/person?email__search=hedgehog')) == [people[1].id]
+    assert ids(client.get('/person?name__search=example')) == []
+
+
+def test_search_combines_with_other_filters(client, people):
+    assert ids(client.get('/person?search=hedgehog&id__gt=2')) == [people[3].id]
+    assert ids(client.get('/person?search=hedgehog&name__search=sanic')) == [people[0].id]
+
+
+def test_search_is_rejected_on_models_without_search_fields(client, people):
+    assert client.get('/job?name__search=dev').status_code == 400
+    assert client.get('/person?job__search=dev').status_code == 400
+
+
+def test_rows_existing_before_the_index_are_backfilled(client, people):
+    assert ids(client.get('/person?search=tails')) == [people[2].id]
+
+
+def test_post_put_and_delete_keep_the_index_in_sync(client, people):
+    response = send_json(client, 'post', '/person', {'name': 'amy rose'})
+    assert response.status_code == 200
+    amy = load(response)['data']['id']
+    assert ids(client.get('/person?search=amy')) == [amy]
+
+    assert send_json(client, 'put', '/person/{}'.format(amy), {'name': 'metal sonic'}).status_code == 200
+    assert ids(client.get('/person?search=amy')) == []
+    assert ids(client.get('/person?search=metal')) == [amy]
+
+    assert client.delete('/person/{}'.format(amy)).status_code == 200
+    assert ids(client.get('/person?search=metal')) == []
+
+
+def test_failed_index_update_rolls_back_the_write(client, people, monkeypatch):
+    def fail(instance):
+        raise RuntimeError('index unavailable')
+
+    monkeypatch.setattr(Person.shortcuts.search_index, 'update', fail)
+    count = Person.select().count()
+
+    assert send_json(client, 'post', '/person', {'name': 'amy rose'}).status_code == 500
+    assert Person.select().count() == count
+
+    assert send_json(client, 'put', '/person/{}'.format(people[2].id), {'name': 'miles'}).status_code == 500
+    assert Person.get(Person.id == people[2].id).name == 'tails'
+
+
+def test_extended_base_route_lists_search_for_searchable_models_only(database, config):
+    config.BASE_ROUTE_EXTENDED_SCHEMA = True
+    routes = load(make_app(config).test_client().get('/'))['data']['routes']
+
+    assert 'search' in routes['person']['filter_options']
+    assert 'search' not in routes['job']['filter_options']
+    assert 'contains' in routes[Job._meta.db_table]['filter_options']